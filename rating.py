@@ -0,0 +1,325 @@
+"""
+Streaming Elo-style ratings for UNO players and bots.
+
+Results are consumed one at a time, so ratings never have to be recomputed
+from the full history. A result is either a single game (rated with the
+points the winner earned) or a whole 500-point set. Any number of seats from
+two to ten is supported: the winner is scored as beating every other seat.
+
+Results can be logged one per line in the following tab-separated format:
+
+  <kind>  <winner index>  <points>  <space-separated player ids>
+
+where kind is "G" for a game or "S" for a set. Player ids must not contain
+whitespace.
+"""
+from array import array
+import math
+from multiprocessing import Pool
+
+
+GAME = "G"
+SET = "S"
+
+
+def format_result(kind, player_ids, winner_index, points=0):
+    """
+    Formats a result as a single log line (without the newline).
+
+    Arguments:
+    kind        (str)        : GAME or SET
+    player_ids  (list of str): Ids of the players in seating order
+    winner_index(int)        : Index of the winner in player_ids
+    points      (int)        : Points earned by the winner
+
+    Return:
+    String
+    """
+    return (kind + "\t" + str(winner_index) + "\t" + str(points) + "\t"
+            + " ".join(player_ids))
+
+
+def parse_result(line):
+    """
+    Parses a log line written by format_result.
+
+    Argument:
+    line(str)
+
+    Return:
+    tuple: (kind, player ids, winner index, points), or None if the line is
+           blank
+    """
+    fields = line.split("\t")
+    if len(fields) != 4:
+        if not line.strip():
+            return None
+        raise ValueError("Malformed result line: " + repr(line))
+    return (fields[0], fields[3].split(), int(fields[1]), int(fields[2]))
+
+
+def parse_log_columns(path):
+    """
+    Reads every result from a log file into flat columns.
+
+    Columns pickle far faster than a list of tuples, which matters when
+    results are sent back from a worker process.
+
+    Argument:
+    path(str)
+
+    Return:
+    tuple: (kinds, winner indices, points, seat counts, player ids), where
+           kinds is a string with one character per result and player ids is
+           a flat list of the ids of every result in order
+    """
+    kinds = []
+    winners = array("b")
+    points = array("l")
+    sizes = array("b")
+    player_ids = []
+    with open(path) as f:
+        for line in f:
+            result = parse_result(line.rstrip("\n"))
+            if result is None:
+                continue
+            kinds.append(result[0])
+            winners.append(result[2])
+            points.append(result[3])
+            sizes.append(len(result[1]))
+            player_ids.extend(result[1])
+    return ("".join(kinds), winners, points, sizes, player_ids)
+
+
+def parse_log(path):
+    """
+    Reads every result from a log file.
+
+    Argument:
+    path(str)
+
+    Return:
+    list of tuple: Results as returned by parse_result
+    """
+    results = []
+    with open(path) as f:
+        for line in f:
+            result = parse_result(line.rstrip("\n"))
+            if result is not None:
+                results.append(result)
+    return results
+
+
+class Rater:
+    """
+    An incremental multiplayer Elo rater.
+
+    Ratings are kept in flat arrays indexed by a slot number assigned to each
+    player id on first sight, so the store stays compact even with millions
+    of players.
+
+    Attributes:
+    k         (float)         : Maximum rating change against one opponent
+                                in a zero-point game
+    set_weight(float)         : Multiplier of k for set results
+    initial   (float)         : Rating given to new players
+    slots     (dict)          : Player id to slot number
+    ids       (list of str)   : Slot number to player id
+    ratings   (array of float): Rating of each slot
+    counts    (array of int)  : Number of rated results of each slot
+    """
+    def __init__(self, k=16.0, set_weight=2.0, initial=1500.0):
+        """
+        Constructor of the rater.
+
+        Arguments:
+        k         (float)
+        set_weight(float)
+        initial   (float)
+        """
+        self.k = k
+        self.set_weight = set_weight
+        self.initial = initial
+        self.slots = {}
+        self.ids = []
+        self.ratings = array("d")
+        self.counts = array("L")
+
+    def __get_slot__(self, player_id):
+        """
+        Returns the slot of the player, allocating one if necessary.
+
+        Argument:
+        player_id(str)
+
+        Return:
+        int
+        """
+        slot = self.slots.get(player_id)
+        if slot is None:
+            slot = len(self.ids)
+            self.slots[player_id] = slot
+            self.ids.append(player_id)
+            self.ratings.append(self.initial)
+            self.counts.append(0)
+        return slot
+
+    def update(self, player_ids, winner_index, points=0, weight=1.0):
+        """
+        Rates a single result.
+
+        The winner plays a pairwise Elo match against every other seat. The
+        change is split evenly across the opponents so that a ten-seat game
+        does not move ratings ten times further than a two-seat game, and it
+        grows logarithmically with the points the winner earned.
+
+        Arguments:
+        player_ids  (list of str): Ids of the players in seating order
+        winner_index(int)        : Index of the winner in player_ids
+        points      (int)        : Points earned by the winner
+        weight      (float)      : Multiplier of k for this result
+        """
+        num_player = len(player_ids)
+        if num_player < 2 or num_player > 10:
+            raise ValueError("There must be two to ten players.")
+        if winner_index < 0 or winner_index >= num_player:
+            raise ValueError("Winner index out of range.")
+        ratings = self.ratings
+        counts = self.counts
+        # Looking up known players inline keeps the hot path free of calls
+        known = self.slots.get
+        slots = []
+        for player_id in player_ids:
+            slot = known(player_id)
+            if slot is None:
+                slot = self.__get_slot__(player_id)
+            slots.append(slot)
+        winner = slots[winner_index]
+        winner_rating = ratings[winner]
+        k = (self.k * weight * (1.0 + math.log1p(points / 100.0))
+             / (num_player - 1))
+        gain = 0.0
+        for slot in slots:
+            if slot == winner:
+                continue
+            # Probability that the winner was expected to lose this pairing
+            upset = 1.0 / (1.0 + 10.0 ** ((winner_rating - ratings[slot])
+                                          / 400.0))
+            ratings[slot] -= k * upset
+            counts[slot] += 1
+            gain += k * upset
+        ratings[winner] = winner_rating + gain
+        counts[winner] += 1
+
+    def record(self, result):
+        """
+        Rates a result as returned by parse_result.
+
+        Argument:
+        result(tuple)
+        """
+        kind, player_ids, winner_index, points = result
+        if kind == SET:
+            self.update(player_ids, winner_index, 0, self.set_weight)
+        else:
+            self.update(player_ids, winner_index, points)
+
+    def record_game(self, game, player_ids):
+        """
+        Rates a game on which game_end has been called.
+
+        Arguments:
+        game      (Game)
+        player_ids(list of str): Ids of game.players in seating order
+        """
+        self.update(player_ids, game.winner_index, game.winner_points)
+
+    def record_set(self, players, player_ids):
+        """
+        Rates a finished 500-point set. The player with the highest score is
+        the winner.
+
+        Arguments:
+        players   (list of Player)
+        player_ids(list of str)   : Ids of the players in seating order
+        """
+        scores = [player.get_score() for player in players]
+        self.update(player_ids, scores.index(max(scores)), 0,
+                    self.set_weight)
+
+    def backfill(self, paths, processes=None):
+        """
+        Rates every result of the given log files.
+
+        Files are parsed in parallel worker processes. Elo depends on the
+        order of results, so they are rated in the order of 'paths' and, in
+        each file, in the order of the lines.
+
+        Arguments:
+        paths    (list of str)
+        processes(int)        : Number of worker processes, or None to use
+                                one per CPU
+
+        Return:
+        int: Number of results rated
+        """
+        total = 0
+        with Pool(processes) as pool:
+            for columns in pool.imap(parse_log_columns, paths):
+                kinds, winners, points, sizes, player_ids = columns
+                start = 0
+                for i in range(len(kinds)):
+                    end = start + sizes[i]
+                    if kinds[i] == SET:
+                        self.update(player_ids[start:end], winners[i], 0,
+                                    self.set_weight)
+                    else:
+                        self.update(player_ids[start:end], winners[i],
+                                    points[i])
+                    start = end
+                total += len(kinds)
+        return total
+
+    def get_rating(self, player_id):
+        """
+        Returns the rating of the player.
+
+        Argument:
+        player_id(str)
+
+        Return:
+        float
+        """
+        slot = self.slots.get(player_id)
+        if slot is None:
+            return self.initial
+        return self.ratings[slot]
+
+    def get_count(self, player_id):
+        """
+        Returns the number of rated results of the player.
+
+        Argument:
+        player_id(str)
+
+        Return:
+        int
+        """
+        slot = self.slots.get(player_id)
+        if slot is None:
+            return 0
+        return self.counts[slot]
+
+    def top(self, n=10):
+        """
+        Returns the players with the highest ratings.
+
+        Argument:
+        n(int)
+
+        Return:
+        list of tuple: (player id, rating) pairs, highest rating first
+        """
+        best = sorted(range(len(self.ids)), key=self.ratings.__getitem__,
+                      reverse=True)[:n]
+        return [(self.ids[slot], self.ratings[slot]) for slot in best]
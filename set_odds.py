@@ -0,0 +1,313 @@
+"""
+Set-level win probabilities for the 500-point match loop.
+
+A set is modelled as a sequence of independent games. Seat i wins each game
+with a fixed probability, and the points it earns are drawn from a fixed
+distribution. Both are learned by simulating games between bots.
+
+The estimate for a scoreboard combines two steps:
+
+  1. A memoized dynamic program over a seat's missing points gives the
+     distribution of the number of game wins the seat still needs.
+  2. If games are imagined to arrive at unit rate in continuous time, the
+     wins of different seats become independent Poisson processes. The
+     order of events, and so the set winner, does not change. Seat i wins
+     the set if it reaches its needed wins before every other seat, which
+     is a one-dimensional integral over time.
+
+Results for a scoreboard are kept in an LRU cache keyed on the score vector,
+so repeated lookups take microseconds.
+"""
+import contextlib
+from functools import lru_cache
+import math
+import os
+import random
+
+from uno import BotPlayer, Game
+
+
+def simulate(num_player, games, seed=None, max_turns=5000):
+    """
+    Plays games between bots and records who won and how many points.
+
+    Output of the games is discarded. Games that last longer than
+    'max_turns' turns are abandoned and not recorded.
+
+    Arguments:
+    num_player(int)
+    games     (int)
+    seed      (int): Seed for the random module, or None to keep its state
+    max_turns (int)
+
+    Return:
+    tuple: (list of winner indices, list of points earned by the winner)
+    """
+    if seed is not None:
+        random.seed(seed)
+    winners = []
+    points = []
+    players = [BotPlayer() for i in range(num_player)]
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            for i in range(games):
+                game = Game(players)
+                turns = 0
+                while game.run():
+                    turns += 1
+                    if turns >= max_turns:
+                        break
+                else:
+                    winners.append(game.game_end())
+                    points.append(game.winner_points)
+    return winners, points
+
+
+class SetOddsEstimator:
+    """
+    Estimator of each seat's probability to win the set.
+
+    Attributes:
+    win_probs(list of float): Probability that each seat wins a single game
+    points   (list of tuple): (points, probability) pairs of the points the
+                              winner of a single game earns
+    target   (int)          : Score needed to win the set
+    steps    (int)          : Number of time steps of the integration
+    needed   (list)         : Memo of the wins-needed distribution for each
+                              number of missing points
+    lookup   (function)     : LRU-cached estimate keyed on a score tuple
+    """
+    def __init__(self, win_probs, points, target=500, steps=256,
+                 cache_size=4096):
+        """
+        Constructor of the estimator.
+
+        Arguments:
+        win_probs (list of float)
+        points    (list of tuple)
+        target    (int)
+        steps     (int)
+        cache_size(int)          : Maximum number of cached scoreboards
+        """
+        total = sum(win_probs)
+        self.win_probs = [p / total for p in win_probs]
+        weight = sum(p for x, p in points)
+        self.points = sorted((x, p / weight) for x, p in points if p > 0)
+        self.target = target
+        self.steps = steps
+        # needed[0] is the distribution of a seat that has already won
+        self.needed = [[1.0]]
+        self.lookup = lru_cache(maxsize=cache_size)(self.__compute__)
+
+    @classmethod
+    def from_samples(cls, num_player, winners, points, target=500, **kwargs):
+        """
+        Builds an estimator from recorded game results.
+
+        Every seat is given one extra win so that no seat has probability
+        zero after a short simulation.
+
+        Arguments:
+        num_player(int)
+        winners   (list of int): Index of the winner of each game
+        points    (list of int): Points earned by the winner of each game
+        target    (int)
+
+        Return:
+        SetOddsEstimator
+        """
+        wins = [1] * num_player
+        for winner in winners:
+            wins[winner] += 1
+        counts = {}
+        for x in points:
+            counts[x] = counts.get(x, 0) + 1
+        return cls(wins, list(counts.items()), target, **kwargs)
+
+    @classmethod
+    def from_simulation(cls, num_player, games=2000, seed=None, target=500,
+                        **kwargs):
+        """
+        Builds an estimator by simulating games between bots.
+
+        Arguments:
+        num_player(int)
+        games     (int)
+        seed      (int)
+        target    (int)
+
+        Return:
+        SetOddsEstimator
+        """
+        winners, points = simulate(num_player, games, seed)
+        return cls.from_samples(num_player, winners, points, target,
+                                **kwargs)
+
+    def estimate(self, scores):
+        """
+        Returns each seat's probability to win the set.
+
+        Argument:
+        scores(list of int): Current score of each seat
+
+        Return:
+        list of float
+        """
+        if len(scores) != len(self.win_probs):
+            raise ValueError("Expected " + str(len(self.win_probs))
+                             + " scores.")
+        return list(self.lookup(tuple(scores)))
+
+    def __wins_needed__(self, missing):
+        """
+        Returns the distribution of the number of game wins a seat needs to
+        earn 'missing' more points.
+
+        The distributions of all smaller numbers of missing points are
+        computed on the way and memoized.
+
+        Argument:
+        missing(int)
+
+        Return:
+        list of float: Probability of needing exactly w wins at index w
+        """
+        missing = max(missing, 0)
+        needed = self.needed
+        points = self.points
+        zero = sum(p for x, p in points if x == 0)
+        for m in range(len(needed), missing + 1):
+            # Probability that one win earns at least m points
+            enough = sum(p for x, p in points if x >= m)
+            dist = [0.0, enough]
+            left = 1.0 - enough
+            while left > 1e-12:
+                w = len(dist)
+                q = zero * dist[w - 1]
+                for x, p in points:
+                    if x >= m:
+                        break
+                    if x > 0 and w - 1 < len(needed[m - x]):
+                        q += p * needed[m - x][w - 1]
+                dist.append(q)
+                left -= q
+                if q < 1e-15 and w > len(needed[-1]) + 1:
+                    break
+            needed.append(dist)
+        return needed[missing]
+
+    def __survival__(self, dist, rate, t):
+        """
+        Returns the probability that a seat has not yet won the set at time
+        't'.
+
+        Arguments:
+        dist(list of float): Wins-needed distribution of the seat
+        rate(float)        : Probability that the seat wins a single game
+        t   (float)
+
+        Return:
+        float
+        """
+        lam = rate * t
+        pmf = math.exp(-lam)
+        cdf = 0.0
+        s = 0.0
+        for w in range(1, len(dist)):
+            # cdf is the probability of fewer than w wins by time t
+            cdf += pmf
+            pmf *= lam / w
+            s += dist[w] * cdf
+        return s
+
+    def __compute__(self, scores):
+        """
+        Computes each seat's probability to win the set.
+
+        Argument:
+        scores(tuple of int)
+
+        Return:
+        tuple of float
+        """
+        num_player = len(scores)
+        best = max(scores)
+        if best >= self.target:
+            return tuple(1.0 if score == best else 0.0 for score in scores)
+        dists = [self.__wins_needed__(self.target - score)
+                 for score in scores]
+        rates = self.win_probs
+        # Integrate until the set has almost surely ended
+        end = 1.0
+        while True:
+            alive = 1.0
+            for i in range(num_player):
+                alive *= self.__survival__(dists[i], rates[i], end)
+            if alive < 1e-9:
+                break
+            end *= 2.0
+        curves = []
+        for i in range(num_player):
+            curves.append([self.__survival__(dists[i], rates[i],
+                                             end * k / self.steps)
+                           for k in range(self.steps + 1)])
+        odds = []
+        for i in range(num_player):
+            s = 0.0
+            for k in range(self.steps):
+                others = 1.0
+                for j in range(num_player):
+                    if j != i:
+                        others *= (curves[j][k] + curves[j][k + 1]) / 2.0
+                s += (curves[i][k] - curves[i][k + 1]) * others
+            odds.append(s)
+        total = sum(odds)
+        return tuple(p / total for p in odds)
+
+
+def monte_carlo(estimator, scores, trials=100000, seed=None):
+    """
+    Estimates each seat's probability to win the set by playing out sets
+    under the estimator's model. Used to validate SetOddsEstimator.
+
+    Arguments:
+    estimator(SetOddsEstimator)
+    scores   (list of int)
+    trials   (int)
+    seed     (int)
+
+    Return:
+    list of float
+    """
+    rng = random.Random(seed)
+    seats = range(len(scores))
+    seat_weights = list(estimator.win_probs)
+    values = [x for x, p in estimator.points]
+    value_weights = [p for x, p in estimator.points]
+    wins = [0] * len(scores)
+    for trial in range(trials):
+        current = list(scores)
+        winner = current.index(max(current))
+        while current[winner] < estimator.target:
+            winner = rng.choices(seats, seat_weights)[0]
+            current[winner] += rng.choices(values, value_weights)[0]
+        wins[winner] += 1
+    return [w / trials for w in wins]
+
+
+def main():
+    num_player = 4
+    estimator = SetOddsEstimator.from_simulation(num_player, 2000, seed=0)
+    print("Single-game win probabilities: "
+          + ", ".join("%.3f" % p for p in estimator.win_probs))
+    for scores in [[0, 0, 0, 0], [250, 100, 0, 0], [450, 400, 300, 0],
+                   [480, 0, 0, 490]]:
+        exact = estimator.estimate(scores)
+        brute = monte_carlo(estimator, scores, 20000, seed=1)
+        print(str(scores) + ": "
+              + ", ".join("%.3f/%.3f" % pair for pair in zip(exact, brute))
+              + " (estimate/Monte Carlo)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,481 @@
+"""
+Soak and load harness for the UNO engine.
+
+Plays endless seeded sets between bots in one or more worker processes and
+writes a JSON report with memory and latency measurements:
+
+  - RSS and, optionally, tracemalloc samples, with the growth per game
+    estimated by a least-squares fit after a warm-up period
+  - tracemalloc statistics of the lines that grew the most
+  - garbage collector pause times
+  - per-turn latency percentiles
+  - the largest hand, discard pile and deck seen, the number of reshuffles,
+    and the first turns after which the 108 cards of the deck were not all
+    accounted for
+
+The run fails, and the process exits with status 1, if memory grows faster
+than the allowed number of bytes per game, if a card goes missing or is
+duplicated, or if the p99 turn latency regresses against a baseline report.
+
+Example:
+  python soak.py --workers 4 --duration 3600 --tracemalloc \\
+      --baseline last_night.json --output tonight.json
+"""
+import argparse
+import contextlib
+import gc
+import json
+import math
+from multiprocessing import Pool
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from uno import BotPlayer, Game
+
+
+DECK_SIZE = 108
+# Memory samples kept per worker; older samples are thinned out beyond this
+MAX_SAMPLES = 1000
+
+
+class RandomBotPlayer(BotPlayer):
+    """
+    A bot that plays a random playable card and calls a random color.
+
+    Attributes:
+    rng(Random): Source of the bot's choices
+    """
+    def __init__(self, rng):
+        """
+        Constructor of the bot.
+
+        Argument:
+        rng(Random)
+        """
+        super().__init__()
+        self.rng = rng
+
+    def respond(self, game, question):
+        """
+        Answers a question asked by the game.
+
+        Arguments:
+        game    (Game)
+        question(str)
+
+        Return:
+        String
+        """
+        if question == "move":
+            playable = [index for index in range(len(self.cards))
+                        if game.__can_be_played__(self.cards[index])]
+            if not playable:
+                return ".d"
+            return ".p " + str(self.rng.choice(playable) + 1)
+        elif question == "wild_color":
+            return self.rng.choice([".r", ".y", ".g", ".b"])
+        return super().respond(game, question)
+
+
+class Histogram:
+    """
+    A histogram of durations with geometric buckets, so that percentiles can
+    be taken over an endless run in constant memory.
+
+    Attributes:
+    buckets(list of int): Count of durations in each bucket
+    count  (int)
+    total  (float)      : Sum of the durations in seconds
+    max    (float)      : Longest duration in seconds
+    """
+    # Bucket i holds durations from LOW * RATIO**(i-1) up to LOW * RATIO**i
+    LOW = 1e-6
+    RATIO = 1.05
+    SIZE = 400
+
+    def __init__(self):
+        """Constructor of the histogram."""
+        self.buckets = [0] * Histogram.SIZE
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        """
+        Records a duration.
+
+        Argument:
+        seconds(float)
+        """
+        if seconds <= Histogram.LOW:
+            index = 0
+        else:
+            index = min(Histogram.SIZE - 1,
+                        1 + int(math.log(seconds / Histogram.LOW)
+                                / math.log(Histogram.RATIO)))
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other):
+        """
+        Adds the durations recorded by another histogram.
+
+        Argument:
+        other(Histogram)
+        """
+        for i in range(Histogram.SIZE):
+            self.buckets[i] += other.buckets[i]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q):
+        """
+        Returns the upper bound of the bucket holding the q-th percentile.
+
+        Argument:
+        q(float): Percentile between 0 and 100
+
+        Return:
+        float: Duration in seconds, or 0 if nothing was recorded
+        """
+        if not self.count:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i in range(Histogram.SIZE):
+            seen += self.buckets[i]
+            if seen >= rank:
+                return min(self.max, Histogram.LOW * Histogram.RATIO ** i)
+        return self.max
+
+    def to_dict(self):
+        """
+        Returns a summary of the histogram for the report, in milliseconds.
+
+        Return:
+        dict
+        """
+        summary = {"count": self.count,
+                   "mean_ms": 1000.0 * self.total / max(self.count, 1),
+                   "max_ms": 1000.0 * self.max}
+        for q in [50, 90, 99, 99.9]:
+            summary["p" + str(q) + "_ms"] = 1000.0 * self.percentile(q)
+        return summary
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Rebuilds a histogram sent back from a worker process.
+
+        Argument:
+        state(dict): The histogram's __dict__
+
+        Return:
+        Histogram
+        """
+        histogram = cls()
+        histogram.__dict__.update(state)
+        return histogram
+
+
+def get_rss():
+    """
+    Returns the resident set size of the current process.
+
+    Return:
+    int: Bytes, or the peak resident set size where the current one is not
+         available
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS reports bytes
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def growth_per_game(samples, index):
+    """
+    Fits a line to memory samples and returns its slope.
+
+    Arguments:
+    samples(list of list): [games played, rss, traced memory] samples
+    index  (int)         : Index of the measurement in a sample
+
+    Return:
+    float: Bytes per game, or 0 if there are fewer than two samples
+    """
+    if len(samples) < 2:
+        return 0.0
+    n = len(samples)
+    mean_x = sum(sample[0] for sample in samples) / n
+    mean_y = sum(sample[index] for sample in samples) / n
+    sxx = sum((sample[0] - mean_x) ** 2 for sample in samples)
+    sxy = sum((sample[0] - mean_x) * (sample[index] - mean_y)
+              for sample in samples)
+    return sxy / sxx if sxx else 0.0
+
+
+def soak(worker, options):
+    """
+    Plays sets in the current process until the run is over.
+
+    Arguments:
+    worker (int)      : Index of the worker, added to the seed
+    options(Namespace): Parsed command line options
+
+    Return:
+    dict: Report of the worker
+    """
+    seed = options.seed + worker
+    random.seed(seed)
+    rng = random.Random(seed)
+    turns = Histogram()
+    pauses = Histogram()
+    gc_start = [0.0]
+
+    def on_gc(phase, info):
+        if phase == "start":
+            gc_start[0] = time.perf_counter()
+        else:
+            pauses.add(time.perf_counter() - gc_start[0])
+
+    gc.callbacks.append(on_gc)
+    if options.tracemalloc:
+        tracemalloc.start(options.tracemalloc_frames)
+    first_snapshot = None
+    samples = []
+    sample_every = options.sample_every
+    games = 0
+    sets = 0
+    abandoned = 0
+    reshuffles = 0
+    max_hand = 0
+    max_discard = 0
+    max_deck = 0
+    lost_cards = []
+    deadline = time.monotonic() + options.duration
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            while ((not options.sets or sets < options.sets)
+                   and (options.sets or time.monotonic() < deadline)):
+                players = []
+                for i in range(options.players):
+                    if options.policy == "first" or (options.policy == "mixed"
+                                                     and i % 2 == 0):
+                        players.append(BotPlayer())
+                    else:
+                        players.append(RandomBotPlayer(rng))
+                while True:
+                    game = Game(players)
+                    turn = 0
+                    deck = len(game.deck)
+                    while True:
+                        start = time.perf_counter()
+                        running = game.run()
+                        turns.add(time.perf_counter() - start)
+                        turn += 1
+                        # Watch the piles explicitly, reshuffles included
+                        if len(game.deck) > deck:
+                            reshuffles += 1
+                        deck = len(game.deck)
+                        max_deck = max(max_deck, deck)
+                        max_discard = max(max_discard, len(game.discard))
+                        cards = deck + len(game.discard)
+                        for player in players:
+                            max_hand = max(max_hand, len(player.cards))
+                            cards += len(player.cards)
+                        if cards != DECK_SIZE and len(lost_cards) < 10:
+                            lost_cards.append({"seed": seed, "set": sets,
+                                               "turn": turn,
+                                               "cards": cards})
+                        if not running or turn >= options.max_turns:
+                            break
+                    games += 1
+                    if running:
+                        abandoned += 1
+                        continue
+                    game.game_end()
+                    if games % sample_every == 0:
+                        traced = 0
+                        if options.tracemalloc:
+                            traced = tracemalloc.get_traced_memory()[0]
+                        samples.append([games, get_rss(), traced])
+                        # Keep the harness itself from growing over weeks
+                        if len(samples) >= 2 * MAX_SAMPLES:
+                            samples = samples[::2]
+                            sample_every *= 2
+                        if (options.tracemalloc and first_snapshot is None
+                                and games >= options.warmup):
+                            first_snapshot = tracemalloc.take_snapshot()
+                    if max(p.get_score() for p in players) >= 500:
+                        break
+                sets += 1
+    gc.callbacks.remove(on_gc)
+    steady = [sample for sample in samples if sample[0] >= options.warmup]
+    report = {"worker": worker,
+              "seed": seed,
+              "sets": sets,
+              "games": games,
+              "abandoned_games": abandoned,
+              "reshuffles": reshuffles,
+              "max_hand": max_hand,
+              "max_discard": max_discard,
+              "max_deck": max_deck,
+              "lost_cards": lost_cards,
+              "rss_bytes": samples[-1][1] if samples else get_rss(),
+              "rss_growth_per_game": growth_per_game(steady, 1),
+              "samples": samples,
+              "turns": turns.__dict__,
+              "gc_pauses": pauses.__dict__}
+    if options.tracemalloc:
+        report["traced_growth_per_game"] = growth_per_game(steady, 2)
+        top = []
+        if first_snapshot is not None:
+            stats = tracemalloc.take_snapshot().compare_to(first_snapshot,
+                                                           "lineno")
+            for stat in stats[:options.top]:
+                top.append({"where": str(stat.traceback),
+                            "size_diff": stat.size_diff,
+                            "count_diff": stat.count_diff})
+        report["traced_top_growth"] = top
+        tracemalloc.stop()
+    return report
+
+
+def run_worker(args):
+    """
+    Entry point of a worker process.
+
+    Argument:
+    args(tuple): (worker index, options)
+
+    Return:
+    dict
+    """
+    return soak(*args)
+
+
+def summarize(reports, options):
+    """
+    Merges the worker reports and checks them against the limits.
+
+    Arguments:
+    reports(list of dict)
+    options(Namespace)
+
+    Return:
+    dict: Report of the whole run
+    """
+    turns = Histogram()
+    pauses = Histogram()
+    for report in reports:
+        turns.merge(Histogram.from_state(report.pop("turns")))
+        pauses.merge(Histogram.from_state(report.pop("gc_pauses")))
+    failures = []
+    for report in reports:
+        for key in ["rss_growth_per_game", "traced_growth_per_game"]:
+            if report.get(key, 0.0) > options.max_growth:
+                failures.append("Worker %d: %s is %.1f bytes, over %.1f"
+                                % (report["worker"], key, report[key],
+                                   options.max_growth))
+        if report["lost_cards"]:
+            failures.append("Worker %d: cards went missing or were "
+                            "duplicated" % report["worker"])
+    summary = {"options": vars(options),
+               "sets": sum(report["sets"] for report in reports),
+               "games": sum(report["games"] for report in reports),
+               "turns": turns.to_dict(),
+               "gc_pauses": pauses.to_dict(),
+               "workers": reports}
+    if options.baseline:
+        with open(options.baseline) as f:
+            baseline = json.load(f)["turns"]["p99_ms"]
+        summary["baseline_p99_ms"] = baseline
+        if summary["turns"]["p99_ms"] > baseline * options.max_p99_regression:
+            failures.append("p99 turn latency is %.3f ms, over %.2f times "
+                            "the baseline of %.3f ms"
+                            % (summary["turns"]["p99_ms"],
+                               options.max_p99_regression, baseline))
+    summary["failures"] = failures
+    summary["passed"] = not failures
+    return summary
+
+
+def parse_args(argv=None):
+    """
+    Parses the command line options.
+
+    Argument:
+    argv(list of str)
+
+    Return:
+    Namespace
+    """
+    parser = argparse.ArgumentParser(description="Soak test the UNO engine.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes")
+    parser.add_argument("--duration", type=float, default=60.0,
+                        help="seconds to run when --sets is not given")
+    parser.add_argument("--sets", type=int, default=0,
+                        help="sets to play per worker")
+    parser.add_argument("--players", type=int, default=4,
+                        help="players per set (2-10)")
+    parser.add_argument("--policy", choices=["first", "random", "mixed"],
+                        default="mixed", help="policy of the bots")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=5000,
+                        help="turns after which a game is abandoned")
+    parser.add_argument("--sample-every", type=int, default=10,
+                        help="games between memory samples")
+    parser.add_argument("--warmup", type=int, default=100,
+                        help="games before memory growth is measured")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="trace Python allocations (slower)")
+    parser.add_argument("--tracemalloc-frames", type=int, default=1)
+    parser.add_argument("--top", type=int, default=10,
+                        help="lines with the most traced growth to report")
+    parser.add_argument("--max-growth", type=float, default=1024.0,
+                        help="allowed memory growth in bytes per game")
+    parser.add_argument("--baseline",
+                        help="report of an earlier run to compare p99 with")
+    parser.add_argument("--max-p99-regression", type=float, default=1.25,
+                        help="allowed ratio of p99 to the baseline p99")
+    parser.add_argument("--output", help="file to write the report to")
+    options = parser.parse_args(argv)
+    if options.players < 2 or options.players > 10:
+        parser.error("There must be two to ten players.")
+    return options
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    jobs = [(worker, options) for worker in range(options.workers)]
+    if options.workers == 1:
+        reports = [run_worker(jobs[0])]
+    else:
+        with Pool(options.workers) as pool:
+            reports = pool.map(run_worker, jobs)
+    summary = summarize(reports, options)
+    text = json.dumps(summary, indent=2)
+    if options.output:
+        with open(options.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    for failure in summary["failures"]:
+        print(failure, file=sys.stderr)
+    return 0 if summary["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -249,6 +249,58 @@ class Player:
         """Sorts the player's current cards."""
         self.cards = sorted(self.cards, key=Card.get_compare_key)
 
+    def respond(self, game, question):
+        """
+        Answers a question asked by the game, by reading the standard input.
+
+        Arguments:
+        game    (Game)
+        question(str) : "move", "keep_or_play", "wild_color" or "challenge"
+
+        Return:
+        String
+        """
+        return input()
+
+
+class BotPlayer(Player):
+    """
+    An UNO player that answers questions with a scripted policy instead of
+    reading the standard input.
+
+    It plays the first playable card in its sorted hand, draws when it has
+    none, plays a drawn card whenever it can, calls the color it holds the
+    most of, and never challenges a Wild Draw Four.
+    """
+    def respond(self, game, question):
+        """
+        Answers a question asked by the game.
+
+        Arguments:
+        game    (Game)
+        question(str) : "move", "keep_or_play", "wild_color" or "challenge"
+
+        Return:
+        String
+        """
+        if question == "move":
+            for index in range(len(self.cards)):
+                if game.__can_be_played__(self.cards[index]):
+                    return ".p " + str(index + 1)
+            return ".d"
+        elif question == "keep_or_play":
+            if game.__can_be_played__(self.cards[-1]):
+                return ".p"
+            return ".k"
+        elif question == "wild_color":
+            counts = [0, 0, 0, 0]
+            for card in self.cards:
+                if card.get_color() != CardColor["BLACK"]:
+                    counts[card.get_color().value - 1] += 1
+            return [".r", ".y", ".g", ".b"][counts.index(max(counts))]
+        else:
+            return ".n"
+
 
 class Game:
     """
@@ -266,6 +318,8 @@ class Game:
                                   order. if false, then the order is
                                   counterclockwise.
     turn        (int)           : Index of the player who has the current turn
+    winner_points(int)          : Points earned by the winner, or 0 if the
+                                  game has not ended yet
     """
     def __init__(self, players):
         """
@@ -281,6 +335,7 @@ class Game:
         self.winner_index = -1
         self.clockwise = True
         self.turn = 1
+        self.winner_points = 0
         self.__init_deck__()
         # Distribute seven cards to every player
         for player in self.players:
@@ -311,11 +366,11 @@ class Game:
         elif self.discard[-1].get_type() == CardType["WILD"]:
             print("Discarded card is a wild card. Choose a color by \".<first "
                   + "letter of color>\" format (without quotations).")
-            called_color = input().lower()
+            called_color = self.__ask__("wild_color").lower()
             while called_color not in [".r", ".y", ".g", ".b"]:
                 print("Invalid input. Choose one from \".r\", \".y\", \".g\", "
                       + "and \".b\" (without quotations).")
-                called_color = input().lower()
+                called_color = self.__ask__("wild_color").lower()
             i = [".r", ".y", ".g", ".b"].index(called_color)
             self.wild_color = CardColor(i+1)
 
@@ -374,6 +429,18 @@ class Game:
         self.discard.append(player.get_cards()[card_index])
         player.discard_card(card_index)
 
+    def __ask__(self, question):
+        """
+        Asks the player who has the current turn to answer a question.
+
+        Argument:
+        question(str): "move", "keep_or_play", "wild_color" or "challenge"
+
+        Return:
+        String
+        """
+        return self.players[self.turn].respond(self, question)
+
     def __next_turn__(self):
         """Proceed to the next player's turn."""
         if self.clockwise:
@@ -455,10 +522,10 @@ class Game:
         elif card.get_type() == CardType["WILD"]:
             print("Choose a color for wild card (\".r\", \".y\", \".g\", or \""
                   + ".b\")")
-            color = input().split()[0]
+            color = self.__ask__("wild_color").split()[0]
             while color not in [".r", ".y", ".g", ".b"]:
                 print("Invalid input.")
-                color = input().split()[0]
+                color = self.__ask__("wild_color").split()[0]
             color_value = [".r", ".y", ".g", ".b"].index(color) + 1
             self.wild_color = CardColor(color_value)
             self.__next_turn__()
@@ -480,10 +547,10 @@ class Game:
             # Choose colour for wild
             print("Choose a color for wild card (\".r\", \".y\", \".g\", or \"."
                   + "b\")")
-            color = input().split()[0]
+            color = self.__ask__("wild_color").split()[0]
             while color not in [".r", ".y", ".g", ".b"]:
                 print("Invalid input.")
-                color = input().split()[0]
+                color = self.__ask__("wild_color").split()[0]
             color_value = [".r", ".y", ".g", ".b"].index(color) + 1
             self.wild_color = CardColor(color_value)
             challenged_index = self.turn
@@ -493,10 +560,10 @@ class Game:
                   + str(self.turn + 1)
                   + " challenge the Wild Draw Four?")
             print("Answer by yes (\".y\") or no (\".n\").")
-            answer = input().split()[0]
+            answer = self.__ask__("challenge").split()[0]
             while answer not in [".y", ".n"]:
                 print("Invalid input.")
-                answer = input().split()[0]
+                answer = self.__ask__("challenge").split()[0]
             # If challenged
             if answer == ".y":
                 print("Player " + str(challenged_index + 1) + "'s cards are:")
@@ -545,7 +612,7 @@ class Game:
         # If the player wins the match
         if not self.players[turn_before].get_cards():
             self.winner_index = turn_before
-			self.wild_color = CardColor["BLACK"]
+            self.wild_color = CardColor["BLACK"]
             return False
         return True
 
@@ -573,7 +640,7 @@ class Game:
               +"quotations).")
         # Loop continues until player makes a valid input.
         while True:
-            move = input().split()
+            move = self.__ask__("move").split()
             if not move:
                 print("Invalid input.")
             # Case of playing a card
@@ -604,10 +671,10 @@ class Game:
                 new_card = self.players[self.turn].get_cards()[-1]
                 print("You have drawn card: " + str(new_card))
                 print("Keep(\".k\") or play(\".p\")?")
-                choice = input()
+                choice = self.__ask__("keep_or_play")
                 while choice.split()[0] not in [".k", ".p"]:
                     print("Invalid input.")
-                    choice = input()
+                    choice = self.__ask__("keep_or_play")
                 # Only play the card if the card can be played
                 if choice.split()[0] == ".p":
                     if self.__can_be_played__(new_card):
@@ -658,6 +725,7 @@ class Game:
                 elif card.get_type() in [CardType["WILD"],
                                          CardType["WILD_DRAW_FOUR"]]:
                     score += 50
+        self.winner_points = score
         self.players[self.winner_index].add_score(score)
         print("Player "
               + str(self.winner_index+1)
@@ -705,4 +773,5 @@ def main():
                 print("Starting next game...")
                 game = Game(players)
 
-main()
+if __name__ == "__main__":
+    main()